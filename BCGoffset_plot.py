@@ -66,6 +66,7 @@ from astropy.coordinates import SkyCoord # Get accurate BCG galaxy distances
 import pandas as pd # Can use other forms of input data if needed. I will always use pandas though
 
 from draw_tails_func import drawtail_decals_RGB # I mean, that's why you're here surely?
+from tail_offset_stats import bootstrap_offset_hist, isotropic_offset_test # Error bars and p-values for the histogram
 
 # Load in example table using pandas
 # Can use other means (loadtxt, genfromtxt etc etc) which might be faster
@@ -167,6 +168,15 @@ example_tails = example_table[(example_table.tail_confidence_JC > 0)]
 # Plot the figure
 plt.figure() 
 plt.hist(example_tails.tail_offset_BCG_JC,bins=6,range=[0,180],edgecolor='k') 
+# Add 1 sigma bootstrap error bars to each bin. Set a seed to get the same error bars each time
+# Skip them if there are no tail offsets (no tails drawn, or only BCGs), as there's nothing to resample
+has_offsets = len(example_tails.tail_offset_BCG_JC.dropna()) > 0
+if has_offsets:
+    counts, lower, upper, bin_edges = bootstrap_offset_hist(example_tails.tail_offset_BCG_JC, seed=1)
+    bin_centres = (bin_edges[:-1] + bin_edges[1:]) / 2
+    plt.errorbar(bin_centres, counts, yerr=[counts - lower, upper - counts], fmt='none', ecolor='k', capsize=3)
+else:
+    print('No tail offsets to use, so skipping the error bars and p-values')
 plt.xlim(0,180) 
 plt.xticks([0,30,60,90,120,150,180]) 
 plt.xlabel('Tail offset (degrees)') 
@@ -176,4 +186,10 @@ plt.tight_layout()
 #plt.savefig('Example_JF_tail_offset_JC.eps') 
 plt.show()       
 
+# Check whether the tails are different to randomly pointing (isotropic) tails
+if has_offsets:
+    isotropic_results = isotropic_offset_test(example_tails.tail_offset_BCG_JC, seed=1)
+    print('Chi-squared p-value against isotropic tails: ', isotropic_results['chi2_p'])
+    print('Mean tail offset: ', isotropic_results['mean_offset'], ', p-value against isotropic tails: ', isotropic_results['mean_p'])
+
 
@@ -25,6 +25,8 @@ The user needs to confirm each galaxy before it will move on. Currently, the  en
 so the user is advised to sit down, and get comfy if a large number of galaxies needs to be classified. 
 Alternatively, break up the input files into separate chunks and run the function on each one.
 A potential save progress feature may be added later (although that doesn't help you now does it).
+If the images have been downloaded in advance (tail_finding.py prefetch), give the same folder as image_dir
+and they will be loaded from disk instead.
 
 Also, the use of interactive plot mode for marking the points (command ion), does not play well with some
 IDEs and python GUI interfaces. There may be problems with programs like spyder and jupiter notebooks when using
@@ -58,12 +60,72 @@ different script.
 The function drawtail_decals_RGB is the main code for downloading Legacy Survey RGB images from the internet to classify them
 (needs a connection to legacysurvey.org)
 
+Update 19/10/2026:
+Added decals_cutout_image, which downloads (or loads a saved copy of) a Legacy Survey cutout, and BCG_tail_offsets,
+which calculates the BCG angle and tail offsets that were in the BCGoffset codes. Both are used by tail_finding.py,
+which runs everything from the command line.
+
 
 author: Jacob P. Crossett
 """
 
 #### Function start ####
-def drawtail_decals_RGB(RA_col,Dec_col):
+def decals_cutout_image(RA,Dec,Zoom=0.25,image_dir=None,timeout=60):
+    '''
+    Gets the Legacy Survey RGB cutout image at a set of coordinates. If image_dir is given, the image
+    is loaded from there if it has already been downloaded, and saved there if not.
+
+    Parameters
+    ----------
+    RA : float
+        RA of the image centre in decimal degrees.
+    Dec : float
+        Dec of the image centre in decimal degrees.
+    Zoom : float
+        Pixel scale of the image in arcsec/pixel. Smaller is more zoomed in.
+    image_dir : str or None
+        Folder to save/load images. If None, the image is always downloaded and never saved.
+    timeout : float
+        Seconds to wait for legacysurvey.org before giving up, so a stalled connection can't hang forever.
+
+    Returns
+    -------
+    image_bytes (bytes)
+        The jpg image, as returned by legacysurvey.org
+    '''
+
+    import os
+    import tempfile
+    import requests
+
+    if image_dir is not None:
+        image_file = os.path.join(image_dir, "%f_%f_%f.jpg" % (RA, Dec, Zoom))
+        if os.path.exists(image_file):
+            with open(image_file, 'rb') as f:
+                return f.read()
+
+    # Pull the image from legacysurvey with the zoom specified - this is a slow step
+    JF_decals_image = requests.get("http://legacysurvey.org/viewer/cutout.jpg?ra=%f&dec=%f&layer=dr8&pixscale=%f" % (RA, Dec, Zoom),
+                                   timeout=timeout)
+    JF_decals_image.raise_for_status() # Don't save a server error as an image
+
+    if image_dir is not None:
+        os.makedirs(image_dir, exist_ok=True)
+        # Write to a temporary file and then move it into place, so a job that is killed part way through
+        # (or two jobs saving the same image) never leaves a half written image that looks like a saved one
+        with tempfile.NamedTemporaryFile(dir=image_dir, suffix='.tmp', delete=False) as f:
+            try:
+                f.write(JF_decals_image.content)
+                f.close()
+                os.replace(f.name, image_file)
+            finally:
+                # Remove the temporary file if the write or move failed (e.g. disk full), so retries don't pile them up
+                if os.path.exists(f.name):
+                    os.remove(f.name)
+
+    return JF_decals_image.content
+
+def drawtail_decals_RGB(RA_col,Dec_col,image_dir=None):
     '''
     Plots images of galaxies based on Legacy Survey cutout images to classify potential jellyfish 
     features and tails. Will always attempt to acquire the image from Legacy Survey, but will show
@@ -78,6 +140,9 @@ def drawtail_decals_RGB(RA_col,Dec_col):
         Input Dec coodinates to look up for legacy survey images. Also used to determine the final 
         angle of the tail, to adjust the RA to account for the spherical RA-Dec system.
         Must be in decimal Dec format, and the same length as RA_col
+    image_dir : str or None
+        Folder of images saved by decals_cutout_image (e.g. from tail_finding.py prefetch).
+        Images not in the folder are downloaded and saved there. If None, every image is downloaded.
 
     Returns
     -------
@@ -101,7 +166,6 @@ def drawtail_decals_RGB(RA_col,Dec_col):
     from matplotlib import pyplot as plt
 
     import io
-    import requests
     from PIL import Image
     
     # Check if the RA and Dec lists are the same size. End if they are not
@@ -121,9 +185,9 @@ def drawtail_decals_RGB(RA_col,Dec_col):
         FOVcheck = False
         Zoom=0.25
         while FOVcheck == False:
-            # Pull the image from legacysurvey with the zoom specified - this is a slow step
-            JF_decals_image = requests.get("http://legacysurvey.org/viewer/cutout.jpg?ra=%f&dec=%f&layer=dr8&pixscale=%f" % (RA_col[row], Dec_col[row],Zoom))
-            image = Image.open(io.BytesIO(JF_decals_image.content))
+            # Pull the image from legacysurvey (or image_dir) with the zoom specified - this is a slow step
+            JF_decals_image = decals_cutout_image(RA_col[row], Dec_col[row], Zoom, image_dir)
+            image = Image.open(io.BytesIO(JF_decals_image))
             
             fig, ax = plt.subplots() # Plot the figure each time
             plt.imshow(image,extent=[-128,128,-128,128]) # Have the centre be labelled [0,0]
@@ -272,6 +336,74 @@ def drawtail_decals_RGB(RA_col,Dec_col):
         
     return(jellyfish_flag_list,tail_confidence,tail_angle_list) #Returns all values
 
+def BCG_tail_offsets(RA_col,Dec_col,BCG_RA,BCG_Dec,jellyfish_flag,tail_confidence,tail_angle):
+    '''
+    Calculates the angle from the BCG (or cluster centre) to each galaxy, and the offset between that angle
+    and the tail angle. This is the same calculation as in BCGoffset_plot.py. Please check Angle_examples.pdf 
+    for a visual example of the angles.
+
+    Parameters
+    ----------
+    RA_col : float (RA decimal coordinates)
+        RA coordinates of the galaxies.
+    Dec_col : float (Dec decimal coordinates)
+        Dec coordinates of the galaxies. Must be the same length as RA_col
+    BCG_RA : float, or float column
+        RA of the BCG/cluster centre. Either a single value for a single cluster, or a column 
+        the same length as RA_col
+    BCG_Dec : float, or float column
+        Dec of the BCG/cluster centre, in the same form as BCG_RA
+    jellyfish_flag : int column
+        Jellyfish flag from drawtail_decals_RGB
+    tail_confidence : int column
+        Tail confidence from drawtail_decals_RGB
+    tail_angle : float column
+        Tail angle from drawtail_decals_RGB
+
+    Returns
+    -------
+    BCG_angle_sky (array - float)
+        The angle from the BCG to the galaxy, measured the same way as the tail angle. Set to 0 for the BCG itself.
+    tail_offset_deviation (array - float)
+        The angular deviation of the tail from the BCG vector (i.e. a tail pointing to a BCG is 180).
+        NaN for the BCG, and 0 for galaxies that aren't jellyfish or don't have a tail.
+        Use 180 - tail_offset_deviation for the angle away from the BCG (a tail pointing to the BCG is 0).
+    '''
+
+    import numpy as np
+    from astropy import units as u # Helps astropy.Skycoord work
+    from astropy.coordinates import SkyCoord # Get accurate BCG galaxy distances
+
+    RA_col = np.asarray(RA_col, dtype=float)
+    Dec_col = np.asarray(Dec_col, dtype=float)
+    if len(RA_col) != len(Dec_col):
+        raise Exception("RA and Dec columns are not the same length!")
+
+    Coord_sky = SkyCoord(RA_col*u.deg, Dec_col*u.deg, frame='icrs')
+    BCG_sky = SkyCoord(np.asarray(BCG_RA, dtype=float)*u.deg, np.asarray(BCG_Dec, dtype=float)*u.deg, frame='icrs')
+
+    # Offsets for all galaxies at once. Each galaxy is matched with its own BCG if there is a BCG column
+    dra, ddec = BCG_sky.spherical_offsets_to(Coord_sky)
+    dra = np.broadcast_to(dra.to_value(u.deg), RA_col.shape)
+    ddec = np.broadcast_to(ddec.to_value(u.deg), RA_col.shape)
+
+    # Make the ra a negative to match the cartesian way the angles are measured (left to right)
+    BCG_angle_sky = np.round(np.degrees(np.arctan2(ddec, -dra)), 0)
+    # If the galaxy is the BCG, with a very small difference, then assume it's zero
+    BCG_angle_sky[(abs(dra) < 1e-8) & (abs(ddec) < 1e-8)] = 0.0
+
+    # Use the absolute value as we don't care about +/-, and keep within 180 degrees
+    tail_angle_diff = abs(np.asarray(tail_angle, dtype=float) - BCG_angle_sky)
+    tail_angle_diff = np.where(tail_angle_diff > 180, abs(360 - tail_angle_diff), tail_angle_diff)
+    # BCGs will have NaN for the tail offsets
+    tail_angle_diff[BCG_angle_sky == 0] = np.nan
+
+    # Only keep where a galaxy is a JF and we are confident about a tail, otherwise assign zero offset
+    has_tail = (np.asarray(tail_confidence) > 0) & (np.asarray(jellyfish_flag) == 1)
+    tail_offset_deviation = np.where(has_tail, tail_angle_diff, 0.0)
+
+    return(BCG_angle_sky,tail_offset_deviation)
+
 def drawtail_decals_testmessage():
     # Testing feature to ensure only some functions are imported when using the example scripts.
     print("I hope you don't see this")
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 14:02:51 2026
+
+Command line version of the example codes, so the file names, column names and cluster centre don't need
+to be edited into a script. Run  python tail_finding.py --help  for the full list of options.
+
+Subcommands:
+classify: Runs drawtail_decals_RGB on a csv table, and saves the table with the JF_flag, tail_confidence and
+    tail_angle columns added (same as Example_usage.py).
+    python tail_finding.py classify Example_table_Poggianti16.csv -o Poggianti16_tails.csv
+
+prefetch: Downloads the Legacy Survey images for a csv table into a folder, so classify can be run without
+    waiting for each image (give the same folder to classify with --image-dir).
+    python tail_finding.py prefetch Example_table_Coma.csv --image-dir Coma_images
+
+offsets: Adds the BCG_angle_sky and tail offset columns to a classified table (same as the BCGoffset codes).
+    Use --centre for a single cluster, otherwise the BCGRA and BCGDec columns are used.
+    python tail_finding.py offsets Coma_tails.csv --centre 194.953054 27.980694 -o Coma_offsets.csv
+
+plot: Plots the tail offset histogram from the offsets table, with optional bootstrap error bars and
+    isotropic p-values from tail_offset_stats.
+    python tail_finding.py plot Coma_offsets.csv --errorbars --save Coma_tail_offset.eps
+
+Only the standard library is imported at the start. pandas, astropy, matplotlib etc. are imported by the
+subcommand that needs them, so --help and prefetch start quickly when run in big batch jobs.
+
+author: Jacob P. Crossett
+"""
+
+import argparse
+import sys
+
+
+def positive_int(value):
+    # argparse type for counts that have to be at least 1, so bad values fail before anything is loaded
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError("must be a positive integer, not %s" % value)
+    return number
+
+
+def positive_float(value):
+    number = float(value)
+    if not number > 0:
+        raise argparse.ArgumentTypeError("must be a positive number, not %s" % value)
+    return number
+
+
+def n_jobs_int(value):
+    # Number of cores, where -1 (or any negative number) means all of them
+    number = int(value)
+    if number == 0:
+        raise argparse.ArgumentTypeError("must be a positive integer, or -1 for all the cores")
+    return number
+
+
+def classify(args):
+    import pandas as pd # Can use other forms of input data if needed. I will always use pandas though
+    from draw_tails_func import drawtail_decals_RGB
+
+    table = pd.read_csv(args.table)
+
+    jf_flag_val,tail_confid,tail_ang_val = drawtail_decals_RGB(table[args.ra_col].values, table[args.dec_col].values,
+                                                               image_dir=args.image_dir)
+
+    table['JF_flag_' + args.suffix] = jf_flag_val
+    table['tail_confidence_' + args.suffix] = tail_confid
+    table['tail_angle_' + args.suffix] = tail_ang_val
+
+    table.to_csv(args.output, index=False)
+
+
+def prefetch(args):
+    import csv
+    from concurrent.futures import ThreadPoolExecutor
+    from draw_tails_func import decals_cutout_image
+
+    # The csv module is enough to read two columns, and is much faster to import than pandas
+    with open(args.table, newline='') as f:
+        coords = [(float(row[args.ra_col]), float(row[args.dec_col])) for row in csv.DictReader(f)]
+
+    def fetch(coord):
+        # Catch the errors here so one bad image doesn't stop the rest, and keep the error to report
+        try:
+            decals_cutout_image(coord[0], coord[1], args.pixscale, args.image_dir, timeout=args.timeout)
+        except Exception as error:
+            return error
+        return None
+
+    # Downloading is waiting on the server, so threads are enough to run several at once
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        errors = list(pool.map(fetch, coords))
+
+    failed = 0
+    for (RA, Dec), error in zip(coords, errors):
+        if error is not None:
+            failed += 1
+            print('Failed to get the image at RA=%f, Dec=%f: %s' % (RA, Dec, error), file=sys.stderr)
+
+    print('%d images in %s, %d failed' % (len(coords) - failed, args.image_dir, failed))
+
+    # Non-zero exit status if anything failed, so batch scripts can rerun it
+    return 1 if failed else 0
+
+
+def offsets(args):
+    import pandas as pd
+    from draw_tails_func import BCG_tail_offsets
+
+    table = pd.read_csv(args.table)
+
+    # Single cluster centre, or a BCG for each galaxy
+    if args.centre is not None:
+        BCG_RA, BCG_Dec = args.centre
+    else:
+        missing = [col for col in (args.bcg_ra_col, args.bcg_dec_col) if col not in table.columns]
+        if missing:
+            print("%s has no column %s. Use --centre RA DEC for a single cluster, or --bcg-ra-col/--bcg-dec-col "
+                  "to name the BCG columns" % (args.table, ' or '.join(missing)), file=sys.stderr)
+            return 1
+        BCG_RA, BCG_Dec = table[args.bcg_ra_col].values, table[args.bcg_dec_col].values
+
+    BCG_angle_sky,tail_offset = BCG_tail_offsets(table[args.ra_col].values, table[args.dec_col].values, BCG_RA, BCG_Dec,
+                                                 table['JF_flag_' + args.suffix].values,
+                                                 table['tail_confidence_' + args.suffix].values,
+                                                 table['tail_angle_' + args.suffix].values)
+
+    table['BCG_angle_sky'] = BCG_angle_sky
+    table['tail_offset_deviation_' + args.suffix] = tail_offset
+    table['tail_offset_BCG_' + args.suffix] = 180 - table['tail_offset_deviation_' + args.suffix]
+
+    table.to_csv(args.output, index=False)
+
+
+def plot(args):
+    import pandas as pd
+    if args.save is not None:
+        import matplotlib
+        matplotlib.use('Agg') # No window needed when only saving the figure
+    from matplotlib import pyplot as plt
+
+    table = pd.read_csv(args.table)
+
+    # Select only the galaxies with confident tails
+    tails = table[table['tail_confidence_' + args.suffix] > 0]['tail_offset_BCG_' + args.suffix]
+
+    plt.figure()
+    plt.hist(tails.dropna(),bins=args.bins,range=[0,180],edgecolor='k')
+
+    # Nothing to resample if there are no tail offsets (no tails drawn, or only BCGs)
+    errorbars, stats = args.errorbars, args.stats
+    if (errorbars or stats) and len(tails.dropna()) == 0:
+        print('No tail offsets to use, so skipping the error bars and p-values')
+        errorbars = stats = False
+
+    if errorbars or stats:
+        from tail_offset_stats import bootstrap_offset_hist, isotropic_offset_test
+
+    if errorbars:
+        counts, lower, upper, bin_edges = bootstrap_offset_hist(tails, bins=args.bins, n_resamples=args.n_resamples,
+                                                                seed=args.seed, n_jobs=args.n_jobs)
+        bin_centres = (bin_edges[:-1] + bin_edges[1:]) / 2
+        plt.errorbar(bin_centres, counts, yerr=[counts - lower, upper - counts], fmt='none', ecolor='k', capsize=3)
+
+    plt.xlim(0,180)
+    plt.xticks([0,30,60,90,120,150,180])
+    plt.xlabel('Tail offset (degrees)')
+    plt.ylabel('counts')
+    plt.tight_layout()
+
+    if stats:
+        isotropic_results = isotropic_offset_test(tails, bins=args.bins, n_resamples=args.n_resamples,
+                                                  seed=args.seed, n_jobs=args.n_jobs)
+        print('Chi-squared p-value against isotropic tails: ', isotropic_results['chi2_p'])
+        print('Mean tail offset: ', isotropic_results['mean_offset'], ', p-value against isotropic tails: ', isotropic_results['mean_p'])
+
+    if args.save is not None:
+        plt.savefig(args.save)
+    else:
+        plt.show()
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Classify jellyfish tails and measure their offsets from the BCG.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    # Options that most subcommands share
+    def add_table_args(subparser):
+        subparser.add_argument('table', help="Input csv table")
+        subparser.add_argument('--ra-col', default='RA', help="Column of galaxy RA in decimal degrees (default: RA)")
+        subparser.add_argument('--dec-col', default='Dec', help="Column of galaxy Dec in decimal degrees (default: Dec)")
+
+    def add_suffix_arg(subparser):
+        subparser.add_argument('--suffix', default='JC',
+                               help="Classifier initials added to the column names, e.g. tail_angle_JC (default: JC)")
+
+    classify_parser = subparsers.add_parser('classify', help="Classify galaxies and draw their tails")
+    add_table_args(classify_parser)
+    add_suffix_arg(classify_parser)
+    classify_parser.add_argument('-o', '--output', required=True, help="Output csv table with the classifications")
+    classify_parser.add_argument('--image-dir', default=None, help="Folder of prefetched images (optional)")
+    classify_parser.set_defaults(func=classify)
+
+    prefetch_parser = subparsers.add_parser('prefetch', help="Download the Legacy Survey images before classifying")
+    add_table_args(prefetch_parser)
+    prefetch_parser.add_argument('--image-dir', required=True, help="Folder to save the images in")
+    prefetch_parser.add_argument('--pixscale', type=positive_float, default=0.25,
+                                 help="Pixel scale in arcsec/pixel, matching the classify starting zoom (default: 0.25)")
+    prefetch_parser.add_argument('--workers', type=positive_int, default=4, help="Number of downloads at once (default: 4)")
+    prefetch_parser.add_argument('--timeout', type=positive_float, default=60,
+                                 help="Seconds to wait for each download before giving up (default: 60)")
+    prefetch_parser.set_defaults(func=prefetch)
+
+    offsets_parser = subparsers.add_parser('offsets', help="Calculate the tail offsets from the BCG")
+    add_table_args(offsets_parser)
+    add_suffix_arg(offsets_parser)
+    offsets_parser.add_argument('-o', '--output', required=True, help="Output csv table with the offsets")
+    offsets_parser.add_argument('--centre', nargs=2, type=float, metavar=('RA', 'DEC'), default=None,
+                                help="Single cluster centre in decimal degrees. If not given, the BCG columns are used")
+    offsets_parser.add_argument('--bcg-ra-col', default='BCGRA', help="Column of BCG RA (default: BCGRA)")
+    offsets_parser.add_argument('--bcg-dec-col', default='BCGDec', help="Column of BCG Dec (default: BCGDec)")
+    offsets_parser.set_defaults(func=offsets)
+
+    plot_parser = subparsers.add_parser('plot', help="Plot the tail offset histogram")
+    plot_parser.add_argument('table', help="Input csv table from the offsets subcommand")
+    add_suffix_arg(plot_parser)
+    plot_parser.add_argument('--bins', type=positive_int, default=6, help="Number of histogram bins (default: 6)")
+    plot_parser.add_argument('--save', default=None, help="Save the figure to this file instead of showing it")
+    plot_parser.add_argument('--errorbars', action='store_true', help="Add bootstrap error bars to each bin")
+    plot_parser.add_argument('--stats', action='store_true', help="Print the p-values against isotropic tails")
+    plot_parser.add_argument('--n-resamples', type=positive_int, default=10**6,
+                             help="Number of bootstrap/Monte Carlo resamples (default: 1000000)")
+    plot_parser.add_argument('--seed', type=int, default=None, help="Random seed for the resamples")
+    plot_parser.add_argument('--n-jobs', type=n_jobs_int, default=1, help="Number of cores for the resamples, -1 for all (default: 1)")
+    plot_parser.set_defaults(func=plot)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 10:12:44 2026
+
+Statistics for the tail offset histograms made by BCGoffset_plot.py and BCGoffset_plot_single_cluster.py.
+Does not run on its own, but is called by other codes.
+
+The BCGoffset codes plot a histogram of tail_offset_BCG_JC (0 = tail pointing at the BCG, 180 = tail pointing
+away from the BCG). These functions put error bars on that histogram, and check whether it differs from what
+you would get if the tails pointed in random directions.
+
+#########
+bootstrap_offset_hist:
+Bootstrap confidence intervals for the counts in each histogram bin. Resampling the galaxies with replacement
+is the same as drawing the bin counts from a multinomial with the observed bin fractions, so each resample only
+costs one multinomial draw rather than a loop over every galaxy. 10^6 resamples takes about half a second,
+whatever the number of galaxies.
+
+isotropic_offset_test:
+Monte Carlo p-values against isotropic tails. If the tail directions are random, the offset is uniform between
+0 and 180 degrees. Tests both the binned counts (chi-squared) and the mean offset. The mean offset needs a random
+offset for every galaxy in every sample, so the time goes up with the number of galaxies: roughly 1 second for
+10^6 samples of 200 galaxies, and 5 seconds for 2000 galaxies. Lower n_resamples, or use n_jobs, for big samples.
+
+permutation_offset_test:
+Permutation test for whether two samples of offsets (e.g. two clusters, or tail_confidence 1 vs 2) have
+different mean offsets. Every relabelling shuffles all the galaxies, so like the mean offset test the time goes
+up with the number of galaxies: roughly 1.5 seconds for 10^6 relabellings of 200 galaxies, and 15 seconds for 2000.
+#########
+
+All three work through the resamples in chunks so the memory use stays small. chunk_size is the number of random
+values held at once (8 bytes each, so the default 10^6 is about 8 MB), and the number of resamples in each chunk
+is worked out from the number of galaxies. Each chunk is boiled down before the next one starts (a count of how
+many resamples beat the observed value for the p-values, and a table of how often each count turned up in each
+bin for the bootstrap), so the memory use doesn't go up with n_resamples either. The chunks can be split across cores with n_jobs, with each core
+holding one chunk at a time. Each chunk gets its own random seed spawned from the input seed, so the results
+are the same whatever n_jobs is set to. If you use n_jobs in a script on Mac or Windows, put the code under
+if __name__ == '__main__': or every core will try to rerun your script.
+
+Offsets that are NaN (the BCGs themselves) are dropped before anything is calculated.
+
+author: Jacob P. Crossett
+"""
+
+import numpy as np
+
+
+def _clean_offsets(offsets):
+    # Turn the input column into a float array and drop the NaN (BCG) values
+    offsets = np.asarray(offsets, dtype=float).ravel()
+    return offsets[np.isfinite(offsets)]
+
+
+def _chunk_sizes(n_resamples, chunk_size):
+    # Split the total number of resamples into chunks of at most chunk_size
+    if n_resamples < 1:
+        raise ValueError("n_resamples must be at least 1")
+    n_full, remainder = divmod(n_resamples, chunk_size)
+    return [chunk_size] * n_full + ([remainder] if remainder else [])
+
+
+def _run_chunks(worker, args, n_resamples, values_per_resample, chunk_size, seed, n_jobs):
+    # Run worker(chunk, seed, *args) over all the chunks and add up the results.
+    # Each worker returns a summary of its chunk (not every resample), so only one is held at a time.
+    # chunk_size is a budget of random values, so bigger samples get fewer resamples per chunk.
+    # One SeedSequence child per chunk means the answer doesn't depend on n_jobs.
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+    sizes = _chunk_sizes(n_resamples, max(1, chunk_size // values_per_resample))
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+
+    total = 0
+    if n_jobs is None or n_jobs == 1 or len(sizes) == 1:
+        for size, child in zip(sizes, seeds):
+            total = total + worker(size, child, *args)
+    else:
+        from concurrent.futures import ProcessPoolExecutor # Only needed when running on several cores
+
+        max_workers = None if n_jobs < 0 else n_jobs # n_jobs=-1 uses all the cores
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            for result in pool.map(worker, sizes, seeds, *[[arg] * len(sizes) for arg in args]):
+                total = total + result
+
+    return total
+
+
+def _bootstrap_counts_chunk(size, seed, n_total, fractions):
+    # How often each count (0 to n_total) turned up in each bin for one chunk, shape (nbins, n_total+1)
+    rng = np.random.default_rng(seed)
+    boot_counts = rng.multinomial(n_total, fractions, size=size)
+
+    # Shift each bin into its own block of n_total+1 values, so one bincount does all the bins at once
+    nbins = len(fractions)
+    shifted = boot_counts + np.arange(nbins) * (n_total + 1)
+    return np.bincount(shifted.ravel(), minlength=nbins * (n_total + 1)).reshape(nbins, n_total + 1)
+
+
+def _table_percentile(table, q):
+    # Percentiles of each bin from the count tables, the same as np.percentile on all the resampled counts.
+    # The k-th smallest count is the first count where the cumulative total goes past k
+    cumulative = np.cumsum(table, axis=1)
+    n_resamples = cumulative[0, -1]
+
+    position = (n_resamples - 1) * q / 100 # np.percentile's default (linear) interpolation
+    below = int(np.floor(position))
+    above = min(below + 1, n_resamples - 1)
+
+    value_below = np.array([np.searchsorted(row, below, side='right') for row in cumulative])
+    value_above = np.array([np.searchsorted(row, above, side='right') for row in cumulative])
+    return value_below + (position - below) * (value_above - value_below)
+
+
+def _isotropic_chunk(size, seed, n_total, probabilities, expected, offset_min, offset_max, chi2, mean_distance):
+    # Number of isotropic samples in one chunk with a chi-squared, and a mean offset as far from the middle,
+    # at least as large as observed. Shape (2,)
+    rng = np.random.default_rng(seed)
+
+    counts = rng.multinomial(n_total, probabilities, size=size)
+    sim_chi2 = ((counts - expected)**2 / expected).sum(axis=1)
+
+    # The mean of n uniform offsets. Drawn as a (size, n) block, which _run_chunks keeps inside chunk_size
+    means = rng.uniform(offset_min, offset_max, size=(size, n_total)).mean(axis=1)
+
+    midpoint = (offset_min + offset_max) / 2
+    return np.array([np.count_nonzero(sim_chi2 >= chi2),
+                     np.count_nonzero(abs(means - midpoint) >= mean_distance)])
+
+
+def _permutation_chunk(size, seed, pooled, n_first, difference):
+    # Number of relabellings in one chunk with a difference in mean offset at least as large as observed
+    rng = np.random.default_rng(seed)
+    shuffled = rng.permuted(np.broadcast_to(pooled, (size, len(pooled))), axis=1)
+    simulated = shuffled[:, :n_first].mean(axis=1) - shuffled[:, n_first:].mean(axis=1)
+    return np.count_nonzero(abs(simulated) >= difference)
+
+
+def _monte_carlo_p(n_exceed, n_resamples):
+    # Add one to the top and bottom so the p-value can never be exactly zero
+    return float((1 + n_exceed) / (1 + n_resamples))
+
+
+def bootstrap_offset_hist(offsets, bins=6, hist_range=(0,180), n_resamples=10**6, confidence=68.27,
+                          chunk_size=10**6, seed=None, n_jobs=1):
+    '''
+    Bootstrap confidence intervals on the counts in each bin of the tail offset histogram.
+
+    Parameters
+    ----------
+    offsets : float (list or array of tail offsets in degrees)
+        The tail offsets to histogram, e.g. example_tails.tail_offset_BCG_JC. NaN values are dropped.
+    bins : int or array of bin edges
+        Passed to np.histogram. The default matches the 6 bins used in the BCGoffset plots.
+    hist_range : (float, float)
+        Range of the histogram in degrees. Ignored if bins is an array of edges.
+    n_resamples : int
+        Number of bootstrap resamples.
+    confidence : float
+        Width of the confidence interval in percent. The default is the 1 sigma interval.
+    chunk_size : int
+        Number of random values to hold in memory at once (each resample uses one per bin).
+        Lower this if memory is tight.
+    seed : int or None
+        Random seed. Use an int to get the same answer each run.
+    n_jobs : int
+        Number of processes to run the chunks on. 1 runs everything in this process, -1 uses all the cores.
+
+    Returns
+    -------
+    counts (array - int)
+        The observed counts in each bin.
+    lower (array - float)
+        Lower edge of the confidence interval on the counts in each bin.
+    upper (array - float)
+        Upper edge of the confidence interval on the counts in each bin.
+    bin_edges (array - float)
+        The bin edges, as returned by np.histogram.
+    '''
+
+    offsets = _clean_offsets(offsets)
+    if len(offsets) == 0:
+        raise ValueError("No finite tail offsets to bootstrap")
+
+    counts, bin_edges = np.histogram(offsets, bins=bins, range=hist_range)
+    n_total = counts.sum()
+    if n_total == 0:
+        raise ValueError("None of the tail offsets fall inside the histogram range")
+
+    # Resample the galaxies inside the histogram range, so the bootstrapped counts sum to the same total
+    count_table = _run_chunks(_bootstrap_counts_chunk, (n_total, counts / n_total),
+                              n_resamples, len(counts), chunk_size, seed, n_jobs)
+
+    tail = (100 - confidence) / 2
+    lower = _table_percentile(count_table, tail)
+    upper = _table_percentile(count_table, 100 - tail)
+
+    return(counts, lower, upper, bin_edges)
+
+
+def isotropic_offset_test(offsets, bins=6, hist_range=(0,180), n_resamples=10**6, chunk_size=10**6,
+                          seed=None, n_jobs=1):
+    '''
+    Monte Carlo test of the tail offsets against randomly pointing (isotropic) tails. For random tails
+    the offset is uniform over hist_range, so the expected histogram is flat and the mean offset is
+    the middle of the range.
+
+    Parameters
+    ----------
+    offsets : float (list or array of tail offsets in degrees)
+        The tail offsets to test. NaN values, and any values outside hist_range, are dropped.
+    bins : int or array of bin edges
+        Passed to np.histogram for the chi-squared test.
+    hist_range : (float, float)
+        Range that the offsets are uniform over for random tails. (0,180) for tail_offset_BCG_JC.
+    n_resamples : int
+        Number of isotropic samples to simulate.
+    chunk_size : int
+        Number of random values to hold in memory at once (each sample uses one per galaxy).
+        Lower this if memory is tight.
+    seed : int or None
+        Random seed. Use an int to get the same answer each run.
+    n_jobs : int
+        Number of processes to run the chunks on. 1 runs everything in this process, -1 uses all the cores.
+
+    Returns
+    -------
+    results (dict)
+        'chi2' : the chi-squared of the observed histogram against a flat one
+        'chi2_p' : fraction of isotropic samples with a chi-squared at least as large
+        'mean_offset' : the observed mean offset
+        'mean_p' : two-sided p-value of the mean offset being this far from the middle of the range
+        'n' : number of offsets used
+    '''
+
+    offsets = _clean_offsets(offsets)
+    if not isinstance(bins, (int, np.integer)):
+        hist_range = (bins[0], bins[-1]) # Edges given, so use their range
+    offsets = offsets[(offsets >= hist_range[0]) & (offsets <= hist_range[1])]
+    n_total = len(offsets)
+    if n_total == 0:
+        raise ValueError("No finite tail offsets inside the histogram range to test")
+
+    counts, bin_edges = np.histogram(offsets, bins=bins, range=hist_range)
+    probabilities = np.diff(bin_edges) / (bin_edges[-1] - bin_edges[0]) # Flat histogram, scaled by bin width
+    expected = n_total * probabilities
+    chi2 = ((counts - expected)**2 / expected).sum()
+
+    midpoint = (hist_range[0] + hist_range[1]) / 2
+    mean_offset = offsets.mean()
+
+    n_exceed = _run_chunks(_isotropic_chunk,
+                           (n_total, probabilities, expected, hist_range[0], hist_range[1],
+                            chi2, abs(mean_offset - midpoint)),
+                           n_resamples, n_total + len(probabilities), chunk_size, seed, n_jobs)
+
+    return({'chi2': float(chi2),
+            'chi2_p': _monte_carlo_p(n_exceed[0], n_resamples),
+            'mean_offset': float(mean_offset),
+            'mean_p': _monte_carlo_p(n_exceed[1], n_resamples),
+            'n': n_total})
+
+
+def permutation_offset_test(offsets_a, offsets_b, n_resamples=10**6, chunk_size=10**6, seed=None, n_jobs=1):
+    '''
+    Permutation test for whether two samples of tail offsets have different mean offsets.
+    The galaxies are pooled and randomly relabelled into two samples of the original sizes.
+
+    Parameters
+    ----------
+    offsets_a : float (list or array of tail offsets in degrees)
+        First sample of tail offsets. NaN values are dropped.
+    offsets_b : float (list or array of tail offsets in degrees)
+        Second sample of tail offsets. NaN values are dropped.
+    n_resamples : int
+        Number of random relabellings.
+    chunk_size : int
+        Number of random values to hold in memory at once (each relabelling uses one per galaxy).
+        Lower this if memory is tight.
+    seed : int or None
+        Random seed. Use an int to get the same answer each run.
+    n_jobs : int
+        Number of processes to run the chunks on. 1 runs everything in this process, -1 uses all the cores.
+
+    Returns
+    -------
+    mean_difference (float)
+        Mean offset of offsets_a minus the mean offset of offsets_b.
+    p_value (float)
+        Two-sided p-value: the fraction of relabellings with a difference at least this large.
+    '''
+
+    offsets_a = _clean_offsets(offsets_a)
+    offsets_b = _clean_offsets(offsets_b)
+    if len(offsets_a) == 0 or len(offsets_b) == 0:
+        raise ValueError("Both samples need at least one finite tail offset")
+
+    mean_difference = offsets_a.mean() - offsets_b.mean()
+    pooled = np.concatenate((offsets_a, offsets_b))
+
+    n_exceed = _run_chunks(_permutation_chunk, (pooled, len(offsets_a), abs(mean_difference)),
+                           n_resamples, len(pooled), chunk_size, seed, n_jobs)
+
+    return(float(mean_difference), _monte_carlo_p(n_exceed, n_resamples))